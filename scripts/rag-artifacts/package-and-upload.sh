@@ -4,6 +4,7 @@
 # Prerequisites:
 #   - aws cli configured with DO Spaces credentials (or s3cmd)
 #   - openssl
+#   - b3sum (optional — adds a BLAKE3 checksum the loader verifies faster than SHA-256)
 #   - RAG_ARTIFACT_ENCRYPTION_KEY env var set
 #   - DO_SPACES_ENDPOINT, DO_SPACES_BUCKET env vars set
 #
@@ -51,6 +52,13 @@ TARBALL_SHA256=$(shasum -a 256 "$TARBALL" | awk '{print $1}')
 echo "    Size: ${TARBALL_SIZE} bytes"
 echo "    SHA-256: ${TARBALL_SHA256}"
 
+BLAKE3_FIELD=""
+if command -v b3sum >/dev/null 2>&1; then
+  TARBALL_BLAKE3=$(b3sum --no-names "$TARBALL")
+  BLAKE3_FIELD="\"blake3_plaintext\": \"${TARBALL_BLAKE3}\","
+  echo "    BLAKE3: ${TARBALL_BLAKE3}"
+fi
+
 # ── Collect stats ───────────────────────────────────────────────────────────
 QDRANT_DIR_SIZE=$(du -sb "${RAG_ROOT}/qdrant" 2>/dev/null | awk '{print $1}' || echo "0")
 STATE_DB_SIZE=$(stat -f%z "${RAG_ROOT}/state.db" 2>/dev/null || stat --printf="%s" "${RAG_ROOT}/state.db")
@@ -64,6 +72,7 @@ cat > "$MANIFEST" <<MANIFEST_EOF
   "embedding_model": "qwen3-embedding",
   "embedding_dim": 4096,
   "sha256_plaintext": "${TARBALL_SHA256}",
+  ${BLAKE3_FIELD}
   "tarball_size_bytes": ${TARBALL_SIZE},
   "qdrant_dir_size_bytes": ${QDRANT_DIR_SIZE},
   "state_db_size_bytes": ${STATE_DB_SIZE},
@@ -6,17 +6,55 @@ Runs once at startup before the service accepts queries.
 import hashlib
 import json
 import logging
-import subprocess
+import os
+import shutil
+import socket
 import tarfile
-import tempfile
-from pathlib import Path
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 import boto3
+from blake3 import blake3
+from botocore.config import Config
+from botocore.exceptions import (
+    IncompleteReadError,
+    ReadTimeoutError,
+    ResponseStreamingError,
+)
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 
 from . import config
 
 logger = logging.getLogger("rag-query.artifact_loader")
 
+# `openssl enc -aes-256-cbc -salt -pbkdf2 -iter 100000` parameters (must match
+# scripts/rag-artifacts/package-and-upload.sh)
+OPENSSL_SALT_MAGIC = b"Salted__"
+PBKDF2_ITERATIONS = 100000
+AES_KEY_BYTES = 32
+AES_IV_BYTES = 16
+
+# Read size for the decrypt stream — large chunks amortize Python call overhead
+STREAM_CHUNK_BYTES = 1024 * 1024
+
+# Extraction target under RAG_INDEX_DIR; the index is only moved into place
+# once its checksum has been verified
+STAGING_DIRNAME = ".incoming"
+
+# Ranged-GET retries for failures while streaming the body, which botocore's
+# own retries do not cover (same error set s3transfer retries for download_file)
+DOWNLOAD_MAX_ATTEMPTS = 5
+DOWNLOAD_RETRY_BACKOFF_SECONDS = 0.5
+RETRYABLE_DOWNLOAD_ERRORS = (
+    socket.timeout,
+    ConnectionError,
+    ReadTimeoutError,
+    IncompleteReadError,
+    ResponseStreamingError,
+)
+
 # Global readiness flag — set after artifact is loaded and verified
 _ready = False
 
@@ -25,6 +63,181 @@ def is_ready() -> bool:
     return _ready
 
 
+class _RangedObjectReader:
+    """
+    File-like reader over an S3 object, fetched with parallel ranged GETs.
+
+    Keeps up to `concurrency` chunk downloads of `chunk_bytes` in flight on a
+    thread pool and hands the bytes back strictly in order, so the consumer
+    (the decrypt stream) sees one sequential stream while the link stays
+    saturated. Peak buffering is roughly `concurrency * chunk_bytes`.
+
+    Each range is retried up to DOWNLOAD_MAX_ATTEMPTS times (exponential
+    backoff) on transient streaming errors or a short read; once exhausted the
+    error surfaces from `read()`.
+    """
+
+    def __init__(
+        self, s3, bucket: str, key: str, size: int, chunk_bytes: int, concurrency: int
+    ):
+        self._s3 = s3
+        self._bucket = bucket
+        self._key = key
+        self._size = size
+        self._chunk_bytes = chunk_bytes
+        self._next_offset = 0
+        self._pending: deque = deque()
+        self._buffer = b""
+        self._pos = 0
+        self._pool = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="artifact-download"
+        )
+        # Prime the sliding window
+        for _ in range(concurrency):
+            self._submit_next()
+
+    def _fetch(self, start: int, end: int) -> bytes:
+        expected = end - start + 1
+        attempt = 1
+        while True:
+            try:
+                obj = self._s3.get_object(
+                    Bucket=self._bucket, Key=self._key, Range=f"bytes={start}-{end}"
+                )
+                body = obj["Body"].read()
+                if len(body) == expected:
+                    return body
+                error: Exception = IncompleteReadError(
+                    actual_bytes=len(body), expected_bytes=expected
+                )
+            except RETRYABLE_DOWNLOAD_ERRORS as exc:
+                error = exc
+            if attempt == DOWNLOAD_MAX_ATTEMPTS:
+                raise error
+            logger.warning(
+                "Range bytes=%d-%d failed (attempt %d/%d): %s — retrying",
+                start,
+                end,
+                attempt,
+                DOWNLOAD_MAX_ATTEMPTS,
+                error,
+            )
+            time.sleep(DOWNLOAD_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+            attempt += 1
+
+    def _submit_next(self) -> None:
+        if self._next_offset >= self._size:
+            return
+        start = self._next_offset
+        end = min(start + self._chunk_bytes, self._size) - 1
+        self._pending.append(self._pool.submit(self._fetch, start, end))
+        self._next_offset = end + 1
+
+    def read(self, n: int = -1) -> bytes:
+        parts = []
+        while n < 0 or n > 0:
+            if self._pos >= len(self._buffer):
+                if not self._pending:
+                    break
+                # Oldest in-flight chunk is next in byte order; refill the window
+                self._buffer = self._pending.popleft().result()
+                self._pos = 0
+                self._submit_next()
+            take = len(self._buffer) - self._pos if n < 0 else n
+            data = self._buffer[self._pos:self._pos + take]
+            self._pos += len(data)
+            parts.append(data)
+            if n > 0:
+                n -= len(data)
+        return b"".join(parts)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _HashingReader:
+    """
+    File-like reader that decrypts an `openssl enc -aes-256-cbc -salt -pbkdf2`
+    stream in-process and hashes the plaintext as it is produced.
+
+    Reads the "Salted__" header from `encrypted`, derives key + IV with
+    PBKDF2-HMAC-SHA256 (matching the openssl CLI defaults), then serves
+    unpadded plaintext through `read(n)`. Every plaintext byte is fed to
+    `hasher` (any hashlib-style object — SHA-256 or BLAKE3) exactly once, so
+    the checksum is available from `hexdigest()` as soon as the stream hits
+    EOF — no second pass over disk.
+
+    Raises RuntimeError if the header is missing or the padding is invalid
+    (wrong key or corrupt data).
+    """
+
+    def __init__(self, encrypted, passphrase: str, hasher):
+        self._encrypted = encrypted
+        self._buffer = b""
+        self._pos = 0
+        self._eof = False
+        self._hasher = hasher
+        self.bytes_read = 0
+
+        header = encrypted.read(len(OPENSSL_SALT_MAGIC) + 8)
+        if len(header) != 16 or not header.startswith(OPENSSL_SALT_MAGIC):
+            raise RuntimeError("Decryption failed: missing openssl salt header")
+        salt = header[len(OPENSSL_SALT_MAGIC):]
+
+        key_iv = hashlib.pbkdf2_hmac(
+            "sha256",
+            passphrase.encode("utf-8"),
+            salt,
+            PBKDF2_ITERATIONS,
+            AES_KEY_BYTES + AES_IV_BYTES,
+        )
+        self._decryptor = Cipher(
+            algorithms.AES(key_iv[:AES_KEY_BYTES]), modes.CBC(key_iv[AES_KEY_BYTES:])
+        ).decryptor()
+        self._unpadder = padding.PKCS7(algorithms.AES.block_size).unpadder()
+
+    def _fill(self) -> None:
+        """Decrypt the next STREAM_CHUNK_BYTES of ciphertext into the buffer."""
+        chunk = self._encrypted.read(STREAM_CHUNK_BYTES)
+        if chunk:
+            plaintext = self._unpadder.update(self._decryptor.update(chunk))
+        else:
+            self._eof = True
+            try:
+                plaintext = (
+                    self._unpadder.update(self._decryptor.finalize())
+                    + self._unpadder.finalize()
+                )
+            except ValueError as exc:
+                # Bad padding almost always means a wrong RAG_ARTIFACT_ENCRYPTION_KEY
+                raise RuntimeError(f"Decryption failed: {exc}") from exc
+        self._hasher.update(plaintext)
+        # Drop consumed bytes so only the unread tail is ever copied
+        self._buffer = self._buffer[self._pos:] + plaintext
+        self._pos = 0
+
+    def read(self, n: int = -1) -> bytes:
+        while not self._eof and (n < 0 or len(self._buffer) - self._pos < n):
+            self._fill()
+        if n < 0:
+            n = len(self._buffer) - self._pos
+        data = self._buffer[self._pos:self._pos + n]
+        self._pos += len(data)
+        self.bytes_read += len(data)
+        return data
+
+    def hexdigest(self) -> str:
+        """Plaintext checksum; only meaningful once read() returned b""."""
+        return self._hasher.hexdigest()
+
+
+def _remove_index() -> None:
+    """Delete whatever extraction left in the index dir, staged or live."""
+    shutil.rmtree(config.RAG_INDEX_DIR / STAGING_DIRNAME, ignore_errors=True)
+    shutil.rmtree(config.QDRANT_PATH, ignore_errors=True)
+    config.STATE_DB_PATH.unlink(missing_ok=True)
+
+
 def load_artifact() -> None:
     """Download, decrypt, extract, and verify the RAG index artifact."""
     global _ready
@@ -52,6 +265,8 @@ def load_artifact() -> None:
         region_name=config.DO_SPACES_REGION,
         aws_access_key_id=config.DO_SPACES_ACCESS_KEY,
         aws_secret_access_key=config.DO_SPACES_SECRET_KEY,
+        # One pooled connection per concurrent ranged GET
+        config=Config(max_pool_connections=config.RAG_ARTIFACT_DOWNLOAD_CONCURRENCY),
     )
     bucket = config.DO_SPACES_BUCKET
 
@@ -73,67 +288,92 @@ def load_artifact() -> None:
     # Download manifest
     manifest_obj = s3.get_object(Bucket=bucket, Key=manifest_file)
     manifest = json.loads(manifest_obj["Body"].read().decode("utf-8"))
-    expected_sha256 = manifest.get("sha256_plaintext", "")
-
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        tmp = Path(tmp_dir)
-        encrypted_path = tmp / artifact_file
-        decrypted_path = tmp / artifact_file.replace(".enc", "")
-
-        # Download encrypted tarball
-        logger.info("Downloading %s (%s)...", artifact_file, bucket)
-        s3.download_file(bucket, artifact_file, str(encrypted_path))
-        logger.info("Downloaded %d bytes", encrypted_path.stat().st_size)
-
-        # Decrypt
-        logger.info("Decrypting...")
-        result = subprocess.run(
-            [
-                "openssl",
-                "enc",
-                "-d",
-                "-aes-256-cbc",
-                "-salt",
-                "-pbkdf2",
-                "-iter",
-                "100000",
-                "-in",
-                str(encrypted_path),
-                "-out",
-                str(decrypted_path),
-                "-pass",
-                f"pass:{config.RAG_ARTIFACT_ENCRYPTION_KEY}",
-            ],
-            capture_output=True,
-            text=True,
+
+    # Prefer BLAKE3 (SIMD + multithreaded, several times faster than SHA-256 on
+    # large artifacts); manifests from older packaging runs only carry SHA-256
+    if manifest.get("blake3_plaintext"):
+        checksum_name = "BLAKE3"
+        expected_checksum = manifest["blake3_plaintext"]
+        hasher = blake3(max_threads=blake3.AUTO)
+    else:
+        checksum_name = "SHA-256"
+        expected_checksum = manifest.get("sha256_plaintext", "")
+        hasher = hashlib.sha256()
+
+    # Single streaming pass, no temp files: parallel ranged GETs -> AES-CBC
+    # decrypt -> checksum tap -> gunzip -> tar extract. Only the extracted
+    # index ever touches disk.
+    head = s3.head_object(Bucket=bucket, Key=artifact_file)
+    encrypted_size = head["ContentLength"]
+    logger.info(
+        "Streaming %s (%s, %d bytes, %d parallel ranges) into %s...",
+        artifact_file,
+        bucket,
+        encrypted_size,
+        config.RAG_ARTIFACT_DOWNLOAD_CONCURRENCY,
+        index_dir,
+    )
+    encrypted = _RangedObjectReader(
+        s3,
+        bucket,
+        artifact_file,
+        encrypted_size,
+        chunk_bytes=config.RAG_ARTIFACT_DOWNLOAD_CHUNK_MB * 1024 * 1024,
+        concurrency=config.RAG_ARTIFACT_DOWNLOAD_CONCURRENCY,
+    )
+    # Extract into a staging dir on the same volume: members land on disk
+    # before the checksum is known, and the volume outlives a killed container
+    staging_dir = index_dir / STAGING_DIRNAME
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    staging_dir.mkdir()
+    try:
+        reader = _HashingReader(
+            encrypted, config.RAG_ARTIFACT_ENCRYPTION_KEY, hasher
         )
-        if result.returncode != 0:
-            raise RuntimeError(f"Decryption failed: {result.stderr}")
-
-        # Verify SHA-256
-        if expected_sha256:
-            logger.info("Verifying SHA-256 checksum...")
-            sha256 = hashlib.sha256()
-            with open(decrypted_path, "rb") as f:
-                for chunk in iter(lambda: f.read(8192), b""):
-                    sha256.update(chunk)
-            actual_sha256 = sha256.hexdigest()
-            if actual_sha256 != expected_sha256:
+        with tarfile.open(fileobj=reader, mode="r|gz") as tar:
+            # "data" filter rejects absolute paths, traversal and special files
+            tar.extractall(path=str(staging_dir), filter="data")
+        # tar stops at its end-of-archive marker; drain the rest so the
+        # checksum and padding check cover every byte
+        while reader.read(STREAM_CHUNK_BYTES):
+            pass
+        logger.info("Decrypted %d bytes", reader.bytes_read)
+
+        # Verify checksum (computed while streaming)
+        if expected_checksum:
+            actual_checksum = reader.hexdigest()
+            if actual_checksum != expected_checksum:
                 raise RuntimeError(
-                    f"Checksum mismatch: expected {expected_sha256}, got {actual_sha256}"
+                    f"Checksum mismatch ({checksum_name}): "
+                    f"expected {expected_checksum}, got {actual_checksum}"
                 )
-            logger.info("Checksum verified OK")
-
-        # Extract
-        logger.info("Extracting to %s...", index_dir)
-        with tarfile.open(decrypted_path, "r:gz") as tar:
-            tar.extractall(path=str(index_dir))
-
-    # Verify extraction
-    if not config.QDRANT_PATH.exists():
-        raise RuntimeError(f"Expected {config.QDRANT_PATH} after extraction — not found")
-    if not config.STATE_DB_PATH.exists():
-        raise RuntimeError(f"Expected {config.STATE_DB_PATH} after extraction — not found")
+            logger.info("Checksum verified OK (%s)", checksum_name)
+
+        # Verify extraction
+        staged_qdrant = staging_dir / config.QDRANT_PATH.name
+        staged_state_db = staging_dir / config.STATE_DB_PATH.name
+        if not staged_qdrant.exists():
+            raise RuntimeError(f"Expected {staged_qdrant} after extraction — not found")
+        if not staged_state_db.exists():
+            raise RuntimeError(
+                f"Expected {staged_state_db} after extraction — not found"
+            )
+
+        # Publish with renames; state.db goes last, so the "already present"
+        # shortcut above only ever sees a complete, verified index even if the
+        # container is killed mid-way
+        shutil.rmtree(config.QDRANT_PATH, ignore_errors=True)
+        config.STATE_DB_PATH.unlink(missing_ok=True)
+        os.replace(staged_qdrant, config.QDRANT_PATH)
+        os.replace(staged_state_db, config.STATE_DB_PATH)
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    except BaseException:
+        # Python-level failures also clean up; anything that kills the process
+        # outright leaves only the staging dir, which the next start discards
+        _remove_index()
+        raise
+    finally:
+        encrypted.close()
 
     logger.info(
         "Artifact loaded: version=%s, qdrant=%s, state_db=%s",
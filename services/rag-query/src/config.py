@@ -16,6 +16,8 @@ OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
 EMBEDDING_MODEL = os.getenv("SLACK_LIBRARIAN_EMBED_MODEL", "qwen3-embedding")
 EMBEDDING_DIM = int(os.getenv("SLACK_LIBRARIAN_EMBED_DIM", "4096"))
 MAX_EMBED_CHARS = int(os.getenv("SLACK_LIBRARIAN_MAX_EMBED_CHARS", "16000"))
+# Query embeddings kept in memory (~16 KB each at 4096 dims)
+EMBED_CACHE_SIZE = int(os.getenv("RAG_EMBED_CACHE_SIZE", "1024"))
 
 # DO Spaces (artifact download)
 DO_SPACES_ENDPOINT = os.getenv("DO_SPACES_ENDPOINT", "https://tor1.digitaloceanspaces.com")
@@ -28,6 +30,13 @@ DO_SPACES_REGION = os.getenv("DO_SPACES_REGION", "tor1")
 RAG_ARTIFACT_VERSION = os.getenv("RAG_ARTIFACT_VERSION", "latest")
 RAG_ARTIFACT_ENCRYPTION_KEY = os.getenv("RAG_ARTIFACT_ENCRYPTION_KEY", "")
 
+# Artifact download — parallel ranged GETs (chunks in flight x chunk size = peak buffer)
+RAG_ARTIFACT_DOWNLOAD_CONCURRENCY = int(os.getenv("RAG_ARTIFACT_DOWNLOAD_CONCURRENCY", "16"))
+RAG_ARTIFACT_DOWNLOAD_CHUNK_MB = int(os.getenv("RAG_ARTIFACT_DOWNLOAD_CHUNK_MB", "16"))
+
+# /stats response cache (index is immutable for the life of the pod)
+STATS_CACHE_TTL_SECONDS = float(os.getenv("RAG_STATS_CACHE_TTL_SECONDS", "30"))
+
 # Service
 SERVICE_PORT = int(os.getenv("PORT", "8082"))
 LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
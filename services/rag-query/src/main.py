@@ -1,13 +1,16 @@
 """FastAPI entry point for rag-query service."""
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
+import orjson
 from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
 
 from . import config
 from .artifact_loader import is_ready, load_artifact
-from .models import QueryRequest, QueryResponse, SearchResult, StatsResponse, ContextMessage
+from .models import QueryRequest, QueryResponse, StatsResponse
 from .query_engine import (
     close_client,
     ensure_collection,
@@ -24,6 +27,27 @@ logger = logging.getLogger("rag-query")
 
 _artifact_version: str | None = None
 
+# Fields of the SearchResult / ContextMessage schemas, used to shape /query
+# output without constructing (and re-validating) the Pydantic models
+_RESULT_FIELDS = (
+    "score",
+    "channel",
+    "date",
+    "ts",
+    "thread_ts",
+    "user_name",
+    "text",
+    "permalink",
+)
+_MESSAGE_FIELDS = ("channel", "date", "ts", "user_name", "text")
+
+
+class OrjsonResponse(JSONResponse):
+    """JSONResponse rendered with orjson (several times faster on nested lists)."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -47,7 +71,10 @@ async def lifespan(app: FastAPI):
     close_client()
 
 
-app = FastAPI(title="rag-query", lifespan=lifespan)
+# orjson for every JSON body (/stats, not-ready /query) — not just /query results
+app = FastAPI(
+    title="rag-query", lifespan=lifespan, default_response_class=OrjsonResponse
+)
 
 
 @app.get("/healthz")
@@ -84,7 +111,9 @@ async def query(req: QueryRequest):
     if not is_ready():
         return QueryResponse(ok=False, query=req.query)
 
-    results = search_messages(
+    # Search blocks on Ollama + Qdrant; keep it off the event loop
+    results = await asyncio.to_thread(
+        search_messages,
         query=req.query,
         limit=req.limit,
         channel=req.channel,
@@ -94,30 +123,29 @@ async def query(req: QueryRequest):
         include_thread_context=req.include_thread_context,
     )
 
+    # Results are built from our own Qdrant payloads — project them onto the
+    # response schema directly; returning a Response skips response_model
+    # validation (the model still documents the endpoint in OpenAPI)
     search_results = []
     for r in results:
-        context_msgs = [ContextMessage(**c) for c in r.get("context", [])]
-        thread_msgs = [ContextMessage(**t) for t in r.get("thread_preview", [])]
-        search_results.append(
-            SearchResult(
-                score=r["score"],
-                channel=r.get("channel"),
-                date=r.get("date"),
-                ts=r.get("ts"),
-                thread_ts=r.get("thread_ts"),
-                user_name=r.get("user_name"),
-                text=r.get("text"),
-                permalink=r.get("permalink"),
-                context=context_msgs,
-                thread_preview=thread_msgs,
-            )
-        )
-
-    return QueryResponse(
-        ok=True,
-        results=search_results,
-        count=len(search_results),
-        query=req.query,
+        item = {field: r.get(field) for field in _RESULT_FIELDS}
+        item["context"] = [
+            {field: c.get(field) for field in _MESSAGE_FIELDS}
+            for c in r.get("context", [])
+        ]
+        item["thread_preview"] = [
+            {field: t.get(field) for field in _MESSAGE_FIELDS}
+            for t in r.get("thread_preview", [])
+        ]
+        search_results.append(item)
+
+    return OrjsonResponse(
+        {
+            "ok": True,
+            "results": search_results,
+            "count": len(search_results),
+            "query": req.query,
+        }
     )
 
 
@@ -3,40 +3,107 @@ Query-only fork of slack_librarian_engine.py.
 Semantic search over pre-built Qdrant + SQLite index.
 """
 
-import os
+import logging
 import re
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
 from typing import Any, Optional
 
+import numpy as np
 import ollama
 from qdrant_client import QdrantClient
+from qdrant_client.local.qdrant_local import QdrantLocal
 from qdrant_client.models import (
+    Direction,
     Distance,
     FieldCondition,
     Filter,
     MatchValue,
+    OrderBy,
+    PayloadSchemaType,
     Range,
     VectorParams,
 )
 
 from . import config
 
+logger = logging.getLogger("rag-query.query_engine")
+
 COLLECTION_NAME = config.COLLECTION_NAME
 
 EMBEDDING_MODEL = config.EMBEDDING_MODEL
 EMBEDDING_DIM = config.EMBEDDING_DIM
 MAX_EMBED_CHARS = config.MAX_EMBED_CHARS
 
+EMBED_POOL_WORKERS = 8
+
 TOKEN_RE = re.compile(r"[a-z0-9#@._-]+")
 
-# Persistent client — initialized at startup, stays open
+# Payload indexes for every field used in search/thread/context filters, so
+# filtered lookups are O(matches) instead of a scan over the collection
+PAYLOAD_INDEXES = {
+    "channel_lower": PayloadSchemaType.KEYWORD,
+    "user_name_lower": PayloadSchemaType.KEYWORD,
+    "thread_ts": PayloadSchemaType.KEYWORD,
+    "source_file": PayloadSchemaType.KEYWORD,
+    "message_index": PayloadSchemaType.INTEGER,
+    "ts_float": PayloadSchemaType.FLOAT,
+}
+
+# Payload fields returned for thread messages
+THREAD_PAYLOAD_FIELDS = [
+    "channel",
+    "date",
+    "ts",
+    "ts_float",
+    "user_name",
+    "text",
+    "is_reply",
+    "source_file",
+    "message_index",
+    "permalink",
+]
+
+# Persistent clients — initialized at startup, stay open
 _client: QdrantClient | None = None
+_ollama_client: ollama.Client | None = None
+_sqlite_conn: sqlite3.Connection | None = None
+# Runs Ollama embedding requests so they overlap with filter construction
+_embed_pool: ThreadPoolExecutor | None = None
+
+# Recent query text -> embedding (LRU, see get_query_embedding); shared by
+# request and embed-pool threads
+_embedding_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
+# Last get_stats() result as (time.monotonic() when computed, stats dict)
+_stats_cache: tuple[float, dict | None] = (0.0, None)
 
 
 def init_client() -> QdrantClient:
-    """Initialize persistent Qdrant client. Called once at startup."""
-    global _client
+    """Initialize persistent Qdrant/Ollama/SQLite clients. Called once at startup."""
+    global _client, _ollama_client, _sqlite_conn, _embed_pool
+    if _ollama_client is None:
+        # Reuses one pooled HTTP connection to the sidecar across queries
+        _ollama_client = ollama.Client(host=config.OLLAMA_HOST, timeout=30)
+    if _embed_pool is None:
+        _embed_pool = ThreadPoolExecutor(
+            max_workers=EMBED_POOL_WORKERS, thread_name_prefix="embed"
+        )
+    if _sqlite_conn is None:
+        # The index is read-only at query time — open once, keep the parsed
+        # schema and page cache warm across /stats and channel lookups
+        _sqlite_conn = sqlite3.connect(
+            f"{config.STATE_DB_PATH.resolve().as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+        )
+        _sqlite_conn.execute("PRAGMA query_only=1")
+        _sqlite_conn.execute("PRAGMA mmap_size=268435456")
     if _client is not None:
         return _client
     _client = QdrantClient(path=str(config.QDRANT_PATH), prefer_grpc=False)
@@ -50,56 +117,124 @@ def get_client() -> QdrantClient:
     return _client
 
 
+def get_state_db() -> sqlite3.Connection:
+    """Get the persistent read-only SQLite connection to state.db."""
+    if _sqlite_conn is None:
+        raise RuntimeError(
+            "SQLite connection not initialized — call init_client() first"
+        )
+    return _sqlite_conn
+
+
 def close_client() -> None:
-    """Close the Qdrant client on shutdown."""
-    global _client
+    """Close the Qdrant client, SQLite connection and embed pool on shutdown."""
+    global _client, _ollama_client, _sqlite_conn, _embed_pool
+    if _embed_pool is not None:
+        _embed_pool.shutdown(wait=False, cancel_futures=True)
+        _embed_pool = None
     if _client is not None:
         try:
             _client.close()
         except Exception:
             pass
         _client = None
+    if _sqlite_conn is not None:
+        try:
+            _sqlite_conn.close()
+        except Exception:
+            pass
+        _sqlite_conn = None
+    _ollama_client = None
 
 
 def ensure_collection() -> QdrantClient:
-    """Verify the collection exists (read-only — creates only if missing)."""
+    """
+    Verify the collection exists (creates only if missing) and that every
+    payload field used in query filters is indexed (see PAYLOAD_INDEXES).
+    """
     client = get_client()
     if not client.collection_exists(COLLECTION_NAME):
         client.create_collection(
             collection_name=COLLECTION_NAME,
             vectors_config=VectorParams(size=EMBEDDING_DIM, distance=Distance.COSINE),
         )
+    # Embedded (path=) Qdrant has no payload indexes (and warns on every call);
+    # a server honours them. Failures must not block startup.
+    if _is_local(client):
+        return client
+    for field_name, field_schema in PAYLOAD_INDEXES.items():
+        try:
+            client.create_payload_index(
+                COLLECTION_NAME, field_name, field_schema=field_schema
+            )
+        except Exception:
+            logger.warning(
+                "Could not create payload index on %s", field_name, exc_info=True
+            )
     return client
 
 
-def get_embedding(text: str) -> list[float]:
-    """Get embedding vector from Ollama sidecar."""
-    if len(text) > MAX_EMBED_CHARS:
-        text = text[:MAX_EMBED_CHARS]
-    host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
-    client = ollama.Client(host=host)
-    response = client.embeddings(model=EMBEDDING_MODEL, prompt=text)
-    return response["embedding"]
-
-
-def _keyword_terms(query: str) -> set[str]:
-    return set(TOKEN_RE.findall(query.lower()))
+def _is_local(client: QdrantClient) -> bool:
+    """True for embedded (path= or :memory:) Qdrant rather than a server."""
+    return isinstance(client._client, QdrantLocal)
 
 
-def _keyword_overlap(query_terms: set[str], text: str) -> float:
-    if not query_terms:
-        return 0.0
-    text_terms = set(TOKEN_RE.findall(text.lower()))
-    if not text_terms:
+def get_embedding(text: str) -> np.ndarray:
+    """Get embedding vector (float32 array) from Ollama sidecar."""
+    if _ollama_client is None:
+        raise RuntimeError("Ollama client not initialized — call init_client() first")
+    if len(text) > MAX_EMBED_CHARS:
+        text = text[:MAX_EMBED_CHARS]
+    response = _ollama_client.embeddings(model=EMBEDDING_MODEL, prompt=text)
+    # One contiguous float32 buffer instead of EMBEDDING_DIM boxed Python floats
+    return np.asarray(response["embedding"], dtype=np.float32)
+
+
+def get_query_embedding(query: str) -> np.ndarray:
+    """
+    Embedding for a search query, served from an LRU of recent queries.
+
+    Slack traffic repeats queries (retries, canned questions), so hits skip
+    the Ollama round-trip. The key is the query with whitespace collapsed and
+    that normalized text is what gets embedded, so a key always maps to the
+    same vector. Case is kept — the model embeds "Toronto" and "toronto"
+    differently. Cached arrays are read-only since they are shared.
+    """
+    key = " ".join(query.split())
+    with _embedding_cache_lock:
+        vector = _embedding_cache.get(key)
+        if vector is not None:
+            _embedding_cache.move_to_end(key)
+            return vector
+
+    vector = get_embedding(key)
+    vector.setflags(write=False)
+    with _embedding_cache_lock:
+        _embedding_cache[key] = vector
+        while len(_embedding_cache) > config.EMBED_CACHE_SIZE:
+            _embedding_cache.popitem(last=False)
+    return vector
+
+
+def _keyword_terms(text: str) -> frozenset[str]:
+    """Lowercased keyword tokens of `text` (used for both query and hits)."""
+    return frozenset(TOKEN_RE.findall(text.lower()))
+
+
+def _keyword_overlap(query_terms: frozenset[str], text_terms: frozenset[str]) -> float:
+    if not query_terms or not text_terms:
         return 0.0
-    overlap = len(query_terms.intersection(text_terms))
-    return overlap / len(query_terms)
+    return len(query_terms & text_terms) / len(query_terms)
 
 
-def _recency_boost(date_str: str) -> float:
+def _recency_boost(date_str: str, today_ordinal: int) -> float:
+    """
+    Linear 0..1 boost over the last ten years. `today_ordinal` is
+    date.today().toordinal(), computed once per query by the caller.
+    """
     try:
-        msg_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        age_days = (date.today() - msg_date).days
+        # fromisoformat is a C fast path; strptime goes through locale machinery
+        age_days = today_ordinal - date.fromisoformat(date_str).toordinal()
         clamped = max(0, min(age_days, 3650))
         return 1.0 - (clamped / 3650.0)
     except Exception:
@@ -111,122 +246,240 @@ def _date_to_unix(value: str, end_of_day: bool = False) -> float:
     return datetime.fromisoformat(value + suffix).timestamp()
 
 
-def _get_source_window(
-    source_file: str, message_index: int, before: int = 1, after: int = 2
-) -> list[dict]:
-    client = get_client()
-    points: list[Any] = []
-    offset = None
-
-    while True:
-        batch, offset = client.scroll(
-            collection_name=COLLECTION_NAME,
-            scroll_filter=Filter(
-                must=[
-                    FieldCondition(
-                        key="source_file", match=MatchValue(value=source_file)
-                    )
-                ]
-            ),
-            limit=500,
-            offset=offset,
-            with_payload=[
-                "message_index",
-                "text",
-                "user_name",
-                "ts",
-                "date",
-                "channel",
-            ],
-            with_vectors=False,
-        )
-        if not batch:
-            break
-        points.extend(batch)
-        if offset is None:
-            break
+def _get_source_windows(
+    anchors: list[tuple[str, Optional[int]]], before: int = 1, after: int = 2
+) -> list[list[dict]]:
+    """
+    Return the messages around each (source_file, message_index) anchor.
 
-    if not points:
-        return []
+    All windows are fetched in a single scroll: one `should` clause per anchor,
+    each bounded to the `message_index` range [i - before, i + after]. Returns
+    one list per anchor (same order), sorted by message_index. Anchors without
+    a message_index get an empty window.
+    """
+    indexed = [anchor for anchor in anchors if anchor[1] is not None]
+    if not indexed:
+        return [[] for _ in anchors]
 
-    ordered = sorted(
-        points, key=lambda point: point.payload.get("message_index", 0)
+    client = get_client()
+    width = before + after + 1
+    points, _ = client.scroll(
+        collection_name=COLLECTION_NAME,
+        scroll_filter=Filter(
+            should=[
+                Filter(
+                    must=[
+                        FieldCondition(
+                            key="source_file", match=MatchValue(value=source_file)
+                        ),
+                        FieldCondition(
+                            key="message_index",
+                            range=Range(
+                                gte=message_index - before, lte=message_index + after
+                            ),
+                        ),
+                    ]
+                )
+                for source_file, message_index in indexed
+            ]
+        ),
+        limit=len(indexed) * width,
+        with_payload=[
+            "source_file",
+            "message_index",
+            "text",
+            "user_name",
+            "ts",
+            "date",
+            "channel",
+        ],
+        with_vectors=False,
     )
-    current_pos = None
-    for pos, point in enumerate(ordered):
-        if point.payload.get("message_index") == message_index:
-            current_pos = pos
-            break
 
-    if current_pos is None:
-        return []
-
-    start = max(0, current_pos - before)
-    end = min(len(ordered), current_pos + after + 1)
-    results: list[dict] = []
-    for point in ordered[start:end]:
-        payload = point.payload
-        results.append(
-            {
-                "channel": payload.get("channel"),
-                "date": payload.get("date"),
-                "ts": payload.get("ts"),
-                "user_name": payload.get("user_name"),
-                "text": payload.get("text"),
-            }
-        )
-    return results
+    # Bucket by file; overlapping windows share points, so slice per anchor below
+    by_file: dict[str, list[Any]] = {}
+    for point in points:
+        by_file.setdefault(point.payload.get("source_file"), []).append(point)
+    for bucket in by_file.values():
+        bucket.sort(key=lambda point: point.payload.get("message_index", 0))
+
+    windows: list[list[dict]] = []
+    for source_file, message_index in anchors:
+        window: list[dict] = []
+        if message_index is None:
+            windows.append(window)
+            continue
+        for point in by_file.get(source_file, []):
+            payload = point.payload
+            if not (
+                message_index - before
+                <= payload.get("message_index", 0)
+                <= message_index + after
+            ):
+                continue
+            window.append(
+                {
+                    "channel": payload.get("channel"),
+                    "date": payload.get("date"),
+                    "ts": payload.get("ts"),
+                    "user_name": payload.get("user_name"),
+                    "text": payload.get("text"),
+                }
+            )
+        windows.append(window)
+    return windows
 
 
 def get_thread_messages(
     channel: str, thread_ts: str, limit: int = 200
 ) -> list[dict]:
+    """
+    Return up to `limit` messages of one thread, oldest first.
+
+    A single scroll ordered by ts_float (range-indexed, see PAYLOAD_INDEXES)
+    returns the earliest `limit` messages already sorted.
+    """
     client = get_client()
     cap = max(1, min(limit, 1000))
-    offset = None
-    points: list[Any] = []
+    points, _ = client.scroll(
+        collection_name=COLLECTION_NAME,
+        scroll_filter=Filter(
+            must=[
+                FieldCondition(
+                    key="channel_lower",
+                    match=MatchValue(value=channel.lower()),
+                ),
+                FieldCondition(
+                    key="thread_ts",
+                    match=MatchValue(value=str(thread_ts)),
+                ),
+            ]
+        ),
+        limit=cap,
+        order_by=OrderBy(key="ts_float", direction=Direction.ASC),
+        with_payload=THREAD_PAYLOAD_FIELDS,
+        with_vectors=False,
+    )
+    return [dict(point.payload) for point in points]
+
+
+def _get_thread_previews(
+    threads: list[tuple[str, str]], limit: int = 12
+) -> list[list[dict]]:
+    """
+    Return up to `limit` messages for each (channel, thread_ts) pair.
+
+    Scrolls one `should` filter covering every distinct thread instead of one
+    scroll per thread, ordered by ts_float and paging only until each thread
+    has its `limit` earliest messages or the matches run out. Returns one list
+    per input pair (same order), oldest first — the same shape and selection
+    as get_thread_messages() (messages sharing the cut-off ts_float may be
+    picked either way, as there).
+    """
+    if not threads:
+        return []
 
-    while len(points) < cap:
-        batch, offset = client.scroll(
-            collection_name=COLLECTION_NAME,
-            scroll_filter=Filter(
+    client = get_client()
+    keys = list(
+        dict.fromkeys((channel.lower(), str(thread_ts)) for channel, thread_ts in threads)
+    )
+    buckets: dict[tuple[str, str], list[Any]] = {key: [] for key in keys}
+    page_size = len(keys) * limit
+    payload_fields = THREAD_PAYLOAD_FIELDS + ["channel_lower", "thread_ts"]
+    seen: set = set()
+
+    def add(points: list[Any]) -> None:
+        for point in points:
+            if point.id in seen:
+                continue
+            seen.add(point.id)
+            payload = point.payload
+            bucket = buckets.get(
+                (payload.get("channel_lower"), str(payload.get("thread_ts")))
+            )
+            if bucket is not None and len(bucket) < limit:
+                bucket.append(point)
+
+    def open_threads() -> list[Filter]:
+        # Threads that already have `limit` messages drop out of later pages,
+        # so short threads don't drag the scan through every message of long ones
+        return [
+            Filter(
                 must=[
-                    FieldCondition(
-                        key="channel_lower",
-                        match=MatchValue(value=channel.lower()),
-                    ),
-                    FieldCondition(
-                        key="thread_ts",
-                        match=MatchValue(value=str(thread_ts)),
-                    ),
+                    FieldCondition(key="channel_lower", match=MatchValue(value=channel)),
+                    FieldCondition(key="thread_ts", match=MatchValue(value=thread_ts)),
                 ]
+            )
+            for (channel, thread_ts), bucket in buckets.items()
+            if len(bucket) < limit
+        ]
+
+    # Pages are bounded by value (ts_float > previous page's last value), so a
+    # page can cut a run of equal timestamps in half; that run is finished with
+    # an id-paged scroll before moving past it. Ties are common (bulk imports,
+    # second-resolution timestamps) and may outnumber a whole page.
+    after: Optional[float] = None
+    thread_clauses = open_threads()
+    while True:
+        batch, _ = client.scroll(
+            collection_name=COLLECTION_NAME,
+            scroll_filter=Filter(
+                should=thread_clauses,
+                must=(
+                    []
+                    if after is None
+                    else [FieldCondition(key="ts_float", range=Range(gt=after))]
+                ),
             ),
-            limit=min(300, cap - len(points)),
-            offset=offset,
-            with_payload=[
-                "channel",
-                "date",
-                "ts",
-                "ts_float",
-                "user_name",
-                "text",
-                "is_reply",
-                "source_file",
-                "message_index",
-                "permalink",
-            ],
+            limit=page_size,
+            order_by=OrderBy(key="ts_float", direction=Direction.ASC),
+            with_payload=payload_fields,
             with_vectors=False,
         )
-        if not batch:
+        add(batch)
+        if len(batch) < page_size:
             break
-        points.extend(batch)
-        if offset is None:
+
+        after = batch[-1].payload.get("ts_float")
+        offset = None
+        while True:
+            ties, offset = client.scroll(
+                collection_name=COLLECTION_NAME,
+                scroll_filter=Filter(
+                    should=thread_clauses,
+                    must=[
+                        FieldCondition(
+                            key="ts_float", range=Range(gte=after, lte=after)
+                        )
+                    ],
+                ),
+                limit=page_size,
+                offset=offset,
+                with_payload=payload_fields,
+                with_vectors=False,
+            )
+            add(ties)
+            if offset is None:
+                break
+        thread_clauses = open_threads()
+        if not thread_clauses:
             break
 
-    ordered = sorted(
-        points, key=lambda point: point.payload.get("ts_float", 0)
-    )
-    return [dict(point.payload) for point in ordered]
+    previews: list[list[dict]] = []
+    for channel, thread_ts in threads:
+        bucket = buckets[(channel.lower(), str(thread_ts))]
+        # Drop the channel_lower/thread_ts keys fetched only for bucketing
+        previews.append(
+            [
+                {
+                    field: point.payload[field]
+                    for field in THREAD_PAYLOAD_FIELDS
+                    if field in point.payload
+                }
+                for point in bucket
+            ]
+        )
+    return previews
 
 
 def search_messages(
@@ -239,8 +492,13 @@ def search_messages(
     include_thread_context: bool = True,
 ) -> list[dict]:
     client = get_client()
+    if _embed_pool is None:
+        raise RuntimeError("Embed pool not initialized — call init_client() first")
     limit = max(1, min(limit, 100))
 
+    # Start the Ollama round-trip first; the filter below is pure CPU
+    embedding_future = _embed_pool.submit(get_query_embedding, query)
+
     conditions: list[FieldCondition] = []
     if channel:
         conditions.append(
@@ -267,7 +525,7 @@ def search_messages(
         )
 
     query_filter = Filter(must=conditions) if conditions else None
-    query_vector = get_embedding(query)
+    query_vector = embedding_future.result()
 
     raw_results = client.query_points(
         collection_name=COLLECTION_NAME,
@@ -276,19 +534,48 @@ def search_messages(
         limit=max(40, limit * 8),
     ).points
 
-    query_terms = _keyword_terms(query)
-    rescored: list[dict] = []
-
-    for hit in raw_results:
-        payload = hit.payload
-        lexical = _keyword_overlap(query_terms, payload.get("text", ""))
-        recency = _recency_boost(payload.get("date", ""))
-        score = float(hit.score) + (0.20 * lexical) + (0.05 * recency)
+    if not raw_results:
+        return []
 
-        rescored.append(
+    query_terms = _keyword_terms(query)
+    today_ordinal = date.today().toordinal()
+    # Tokenize every candidate once; repeated texts share one set
+    term_cache: dict[str, frozenset[str]] = {}
+
+    # Gather the per-hit signals into arrays, then combine them in one vector op
+    count = len(raw_results)
+    vector_scores = np.empty(count, dtype=np.float64)
+    lexical_scores = np.empty(count, dtype=np.float64)
+    recency_scores = np.empty(count, dtype=np.float64)
+    for i, hit in enumerate(raw_results):
+        text = hit.payload.get("text", "")
+        if text not in term_cache:
+            term_cache[text] = _keyword_terms(text)
+        vector_scores[i] = hit.score
+        lexical_scores[i] = _keyword_overlap(query_terms, term_cache[text])
+        recency_scores[i] = _recency_boost(hit.payload.get("date", ""), today_ordinal)
+    scores = vector_scores + (0.20 * lexical_scores) + (0.05 * recency_scores)
+
+    # Select the top `limit` without a full sort, then order just those
+    # (stable, so ties keep Qdrant's order). argpartition picks arbitrarily
+    # among scores tied at the cut-off, so fill those slots in hit order.
+    if count > limit:
+        cutoff = np.partition(scores, count - limit)[count - limit]
+        above = np.flatnonzero(scores > cutoff)
+        tied = np.flatnonzero(scores == cutoff)[: limit - len(above)]
+        top_idx = np.sort(np.concatenate((above, tied)))
+    else:
+        top_idx = np.arange(count)
+    top_idx = top_idx[np.argsort(-scores[top_idx], kind="stable")]
+
+    # Only the winners are materialized as result dicts
+    top: list[dict] = []
+    for i in top_idx:
+        payload = raw_results[i].payload
+        top.append(
             {
-                "score": score,
-                "vector_score": float(hit.score),
+                "score": float(scores[i]),
+                "vector_score": float(vector_scores[i]),
                 "channel": payload.get("channel"),
                 "date": payload.get("date"),
                 "ts": payload.get("ts"),
@@ -302,24 +589,22 @@ def search_messages(
             }
         )
 
-    rescored.sort(key=lambda result: result["score"], reverse=True)
-    top = rescored[:limit]
-
-    for item in top:
-        item["context"] = _get_source_window(
-            source_file=item["source_file"],
-            message_index=item["message_index"],
-            before=1,
-            after=2,
+    # One batched scroll per phase instead of two lookups per result
+    windows = _get_source_windows(
+        [(item["source_file"], item["message_index"]) for item in top],
+        before=1,
+        after=2,
+    )
+    if include_thread_context:
+        previews = _get_thread_previews(
+            [(item["channel"], item["thread_ts"]) for item in top], limit=12
         )
-        if include_thread_context:
-            item["thread_preview"] = get_thread_messages(
-                channel=item["channel"],
-                thread_ts=item["thread_ts"],
-                limit=12,
-            )
-        else:
-            item["thread_preview"] = []
+    else:
+        previews = [[] for _ in top]
+
+    for item, window, preview in zip(top, windows, previews):
+        item["context"] = window
+        item["thread_preview"] = preview
 
     return top
 
@@ -327,8 +612,7 @@ def search_messages(
 def list_indexed_channels(
     limit: int = 100, name_contains: Optional[str] = None
 ) -> list[dict]:
-    conn = sqlite3.connect(config.STATE_DB_PATH)
-    cursor = conn.cursor()
+    cursor = get_state_db().cursor()
 
     if name_contains:
         cursor.execute(
@@ -355,7 +639,7 @@ def list_indexed_channels(
         )
 
     rows = cursor.fetchall()
-    conn.close()
+    cursor.close()
 
     return [
         {
@@ -369,8 +653,18 @@ def list_indexed_channels(
 
 
 def get_stats() -> dict:
-    conn = sqlite3.connect(config.STATE_DB_PATH)
-    cursor = conn.cursor()
+    """
+    Index metadata for /stats. The result is cached for
+    STATS_CACHE_TTL_SECONDS since the index does not change while the pod runs
+    and both the SQLite aggregate and the Qdrant count touch every row.
+    """
+    global _stats_cache
+    cached_at, cached = _stats_cache
+    age = time.monotonic() - cached_at
+    if cached is not None and age < config.STATS_CACHE_TTL_SECONDS:
+        return dict(cached)
+
+    cursor = get_state_db().cursor()
     cursor.execute(
         """
         SELECT
@@ -382,18 +676,21 @@ def get_stats() -> dict:
         """
     )
     row = cursor.fetchone()
-    conn.close()
+    cursor.close()
 
-    qdrant_count = 0
     try:
         client = get_client()
+        # Approximate count comes from segment metadata instead of a full scan
         qdrant_count = int(
-            client.count(collection_name=COLLECTION_NAME, exact=True).count
+            client.count(collection_name=COLLECTION_NAME, exact=False).count
         )
+        cacheable = True
     except Exception:
+        # Report 0, but don't pin a transient failure for the whole TTL
         qdrant_count = 0
+        cacheable = False
 
-    return {
+    stats = {
         "db_root": str(config.RAG_INDEX_DIR),
         "collection": COLLECTION_NAME,
         "embedding_model": EMBEDDING_MODEL,
@@ -403,3 +700,6 @@ def get_stats() -> dict:
         "last_indexed": row[3],
         "qdrant_points": qdrant_count,
     }
+    if cacheable:
+        _stats_cache = (time.monotonic(), stats)
+    return dict(stats)
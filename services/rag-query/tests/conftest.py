@@ -0,0 +1,7 @@
+"""Shared pytest setup for rag-query unit tests."""
+
+import sys
+from pathlib import Path
+
+# Tests import the service as `src.<module>`, matching how uvicorn loads it
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,312 @@
+"""
+Unit tests for the streaming artifact pipeline in `src.artifact_loader`.
+
+Artifacts are produced exactly as scripts/rag-artifacts/package-and-upload.sh
+does (`tar -czf` piped through `openssl enc -aes-256-cbc -pbkdf2`) and served
+from an in-memory fake S3 client that honours `Range` headers.
+
+Run from services/rag-query:  python -m pytest -q
+"""
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import tarfile
+
+import pytest
+from blake3 import blake3
+from botocore.exceptions import ReadTimeoutError
+
+from src import artifact_loader, config
+
+PASSPHRASE = "test-passphrase"
+
+pytestmark = pytest.mark.skipif(
+    shutil.which("openssl") is None, reason="openssl CLI required to build artifacts"
+)
+
+
+class FakeS3:
+    """In-memory stand-in for the boto3 S3 client calls the loader makes."""
+
+    def __init__(self, objects: dict[str, bytes]):
+        self.objects = objects
+        self.ranges: list[tuple[int, int]] = []
+        # Queue of faults injected into the next ranged GETs ("timeout" / "short")
+        self.faults: list[str] = []
+
+    def head_object(self, Bucket, Key):
+        return {"ContentLength": len(self.objects[Key])}
+
+    def get_object(self, Bucket, Key, Range=None):
+        data = self.objects[Key]
+        if Range is None:
+            return {"Body": io.BytesIO(data)}
+        start, end = (int(part) for part in Range.removeprefix("bytes=").split("-"))
+        self.ranges.append((start, end))
+        fault = self.faults.pop(0) if self.faults else None
+        if fault == "timeout":
+            raise ReadTimeoutError(endpoint_url="fake://s3")
+        body = data[start : end + 1]
+        if fault == "short":
+            body = body[:-1]
+        return {"Body": io.BytesIO(body)}
+
+
+def _encrypt(plaintext: bytes, passphrase: str) -> bytes:
+    """Encrypt with the same openssl invocation the packaging script uses."""
+    result = subprocess.run(
+        [
+            "openssl",
+            "enc",
+            "-aes-256-cbc",
+            "-salt",
+            "-pbkdf2",
+            "-iter",
+            str(artifact_loader.PBKDF2_ITERATIONS),
+            "-pass",
+            f"pass:{passphrase}",
+        ],
+        input=plaintext,
+        capture_output=True,
+        check=True,
+    )
+    return result.stdout
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    """An index tarball (qdrant/ + state.db) and its encrypted form."""
+    src = tmp_path / "src"
+    (src / "qdrant" / "collection").mkdir(parents=True)
+    # Incompressible payload so the ciphertext spans several 1 MiB download chunks
+    segment = src / "qdrant" / "collection" / "segment.bin"
+    segment.write_bytes(os.urandom(3_500_000))
+    (src / "state.db").write_bytes(b"sqlite-placeholder" * 100)
+
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        tar.add(src / "qdrant", arcname="qdrant")
+        tar.add(src / "state.db", arcname="state.db")
+    plaintext = buffer.getvalue()
+    return {
+        "src": src,
+        "plaintext": plaintext,
+        "encrypted": _encrypt(plaintext, PASSPHRASE),
+    }
+
+
+@pytest.fixture
+def loader_env(tmp_path, monkeypatch):
+    """Point config at an empty index dir and small download chunks."""
+    index_dir = tmp_path / "index"
+    monkeypatch.setattr(config, "RAG_INDEX_DIR", index_dir)
+    monkeypatch.setattr(config, "QDRANT_PATH", index_dir / "qdrant")
+    monkeypatch.setattr(config, "STATE_DB_PATH", index_dir / "state.db")
+    monkeypatch.setattr(config, "DO_SPACES_ACCESS_KEY", "access")
+    monkeypatch.setattr(config, "DO_SPACES_SECRET_KEY", "secret")
+    monkeypatch.setattr(config, "RAG_ARTIFACT_ENCRYPTION_KEY", PASSPHRASE)
+    monkeypatch.setattr(config, "RAG_ARTIFACT_VERSION", "1")
+    monkeypatch.setattr(config, "RAG_ARTIFACT_DOWNLOAD_CONCURRENCY", 3)
+    monkeypatch.setattr(config, "RAG_ARTIFACT_DOWNLOAD_CHUNK_MB", 1)
+    monkeypatch.setattr(artifact_loader, "_ready", False)
+    return index_dir
+
+
+def _install_s3(monkeypatch, encrypted: bytes, manifest: dict) -> FakeS3:
+    s3 = FakeS3(
+        {
+            "rag-index-v1.tar.gz.enc": encrypted,
+            "rag-index-v1-manifest.json": json.dumps(manifest).encode("utf-8"),
+        }
+    )
+    monkeypatch.setattr(artifact_loader.boto3, "client", lambda *args, **kwargs: s3)
+    return s3
+
+
+# ---------------------------------------------------------------------------
+# _RangedObjectReader
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("read_size", [1, 333, 1000, 4096, -1])
+def test_ranged_reader_reassembles_across_chunk_boundaries(read_size):
+    data = os.urandom(10_007)
+    s3 = FakeS3({"blob": data})
+    reader = artifact_loader._RangedObjectReader(
+        s3, "bucket", "blob", len(data), chunk_bytes=1000, concurrency=3
+    )
+    try:
+        parts = []
+        while chunk := reader.read(read_size):
+            parts.append(chunk)
+    finally:
+        reader.close()
+
+    assert b"".join(parts) == data
+    # Contiguous, non-overlapping ranges covering the object; last one is short
+    assert sorted(s3.ranges) == [
+        (start, min(start + 999, len(data) - 1)) for start in range(0, len(data), 1000)
+    ]
+
+
+def test_ranged_reader_retries_timeouts_and_short_reads(monkeypatch):
+    monkeypatch.setattr(artifact_loader, "DOWNLOAD_RETRY_BACKOFF_SECONDS", 0)
+    data = os.urandom(2_500)
+    s3 = FakeS3({"blob": data})
+    s3.faults = ["timeout", "short"]
+    reader = artifact_loader._RangedObjectReader(
+        s3, "bucket", "blob", len(data), chunk_bytes=1000, concurrency=1
+    )
+    try:
+        assert reader.read() == data
+    finally:
+        reader.close()
+    # First range needed three attempts
+    assert s3.ranges.count((0, 999)) == 3
+
+
+def test_ranged_reader_gives_up_after_max_attempts(monkeypatch):
+    monkeypatch.setattr(artifact_loader, "DOWNLOAD_RETRY_BACKOFF_SECONDS", 0)
+    data = os.urandom(500)
+    s3 = FakeS3({"blob": data})
+    s3.faults = ["timeout"] * artifact_loader.DOWNLOAD_MAX_ATTEMPTS
+    reader = artifact_loader._RangedObjectReader(
+        s3, "bucket", "blob", len(data), chunk_bytes=1000, concurrency=1
+    )
+    try:
+        with pytest.raises(ReadTimeoutError):
+            reader.read()
+    finally:
+        reader.close()
+
+
+# ---------------------------------------------------------------------------
+# _HashingReader
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("hasher_factory", [hashlib.sha256, blake3])
+def test_hashing_reader_decrypts_and_hashes_plaintext(artifact, hasher_factory):
+    reader = artifact_loader._HashingReader(
+        io.BytesIO(artifact["encrypted"]), PASSPHRASE, hasher_factory()
+    )
+    parts = []
+    # Odd read size so reads straddle AES blocks and internal refills
+    while chunk := reader.read(4_099):
+        parts.append(chunk)
+
+    assert b"".join(parts) == artifact["plaintext"]
+    assert reader.bytes_read == len(artifact["plaintext"])
+    assert reader.hexdigest() == hasher_factory(artifact["plaintext"]).hexdigest()
+
+
+def test_hashing_reader_rejects_missing_salt_header():
+    with pytest.raises(RuntimeError, match="salt header"):
+        artifact_loader._HashingReader(
+            io.BytesIO(b"not-an-artifact" * 4), "k", hashlib.sha256()
+        )
+
+
+def test_hashing_reader_wrong_key_fails_padding_check(artifact):
+    reader = artifact_loader._HashingReader(
+        io.BytesIO(artifact["encrypted"]), "wrong-passphrase", hashlib.sha256()
+    )
+    with pytest.raises(RuntimeError, match="Decryption failed"):
+        while reader.read(65_536):
+            pass
+
+
+# ---------------------------------------------------------------------------
+# load_artifact: stream -> extract -> drain -> verify
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("checksum_key", ["sha256_plaintext", "blake3_plaintext"])
+def test_load_artifact_extracts_verified_index(
+    artifact, loader_env, monkeypatch, checksum_key
+):
+    digest = hashlib.sha256 if checksum_key == "sha256_plaintext" else blake3
+    manifest = {checksum_key: digest(artifact["plaintext"]).hexdigest()}
+    s3 = _install_s3(monkeypatch, artifact["encrypted"], manifest)
+
+    artifact_loader.load_artifact()
+
+    assert artifact_loader.is_ready()
+    assert len(s3.ranges) == 4
+    segment = "qdrant/collection/segment.bin"
+    assert (loader_env / segment).read_bytes() == (
+        artifact["src"] / segment
+    ).read_bytes()
+    assert (loader_env / "state.db").read_bytes() == (
+        artifact["src"] / "state.db"
+    ).read_bytes()
+
+
+def test_load_artifact_wrong_key_removes_index(artifact, loader_env, monkeypatch):
+    manifest = {"sha256_plaintext": hashlib.sha256(artifact["plaintext"]).hexdigest()}
+    _install_s3(monkeypatch, artifact["encrypted"], manifest)
+    monkeypatch.setattr(config, "RAG_ARTIFACT_ENCRYPTION_KEY", "wrong-passphrase")
+
+    # Garbage plaintext trips gzip/tar or the final padding check, whichever comes first
+    with pytest.raises((RuntimeError, tarfile.TarError)):
+        artifact_loader.load_artifact()
+
+    assert not artifact_loader.is_ready()
+    assert list(loader_env.iterdir()) == []
+
+
+@pytest.mark.parametrize("checksum_key", ["sha256_plaintext", "blake3_plaintext"])
+def test_load_artifact_checksum_mismatch_removes_index(
+    artifact, loader_env, monkeypatch, checksum_key
+):
+    _install_s3(monkeypatch, artifact["encrypted"], {checksum_key: "0" * 64})
+    removed = []
+    original_remove = artifact_loader._remove_index
+    monkeypatch.setattr(
+        artifact_loader,
+        "_remove_index",
+        lambda: (removed.append(True), original_remove())[1],
+    )
+
+    with pytest.raises(RuntimeError, match="Checksum mismatch"):
+        artifact_loader.load_artifact()
+
+    # Extraction completed before verification; the cleanup must undo it
+    assert removed == [True]
+    assert not artifact_loader.is_ready()
+    assert list(loader_env.iterdir()) == []
+
+
+def test_load_artifact_publishes_only_after_verification(
+    artifact, loader_env, monkeypatch
+):
+    manifest = {"sha256_plaintext": hashlib.sha256(artifact["plaintext"]).hexdigest()}
+    _install_s3(monkeypatch, artifact["encrypted"], manifest)
+    # Leftovers of a container killed mid-extraction, before the staging swap
+    stale = loader_env / artifact_loader.STAGING_DIRNAME
+    (stale / "qdrant").mkdir(parents=True)
+    (stale / "state.db").write_bytes(b"truncated")
+
+    live_at_verify = []
+    original_hexdigest = artifact_loader._HashingReader.hexdigest
+
+    def hexdigest(self):
+        live_at_verify.append(
+            (config.QDRANT_PATH.exists(), config.STATE_DB_PATH.exists())
+        )
+        return original_hexdigest(self)
+
+    monkeypatch.setattr(artifact_loader._HashingReader, "hexdigest", hexdigest)
+
+    artifact_loader.load_artifact()
+
+    # Nothing visible to the "already present" shortcut until verified
+    assert live_at_verify == [(False, False)]
+    assert sorted(path.name for path in loader_env.iterdir()) == ["qdrant", "state.db"]
+    assert (loader_env / "state.db").read_bytes() == (
+        artifact["src"] / "state.db"
+    ).read_bytes()
@@ -0,0 +1,520 @@
+"""
+Unit tests for the batched lookups, ranking and caches in `src.query_engine`.
+
+Runs against an embedded Qdrant index. `_get_thread_previews` pages one
+ts_float-ordered scroll across many threads, so it is checked against a
+brute-force reference (and the per-thread `get_thread_messages`) with heavy
+ts_float ties, where value-based paging is easiest to get wrong.
+`_get_source_windows` is checked against the per-hit scroll it replaced.
+
+Run from services/rag-query:  python -m pytest -q
+"""
+
+import random
+import re
+import sqlite3
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    MatchValue,
+    PointStruct,
+    Range,
+    VectorParams,
+)
+
+from src import config, query_engine
+
+NUM_POINTS = 2_000
+NUM_THREAD_SETS = 50
+CHANNELS = ["General", "eng-Backend", "random"]
+TIE_VECTOR = [0.3, -0.2, 0.9, 0.1]
+WORDS = ["venue", "booking", "#general", "@bob", "lunch", "deploy", "v1.2", "Venue"]
+DATES = [
+    str(date.today() - timedelta(days=30)),
+    "2019-06-30",
+    "2012-02-03",
+    "2031-01-01",
+    "",
+    "bogus",
+]
+
+
+class StubOllama:
+    """Stands in for ollama.Client; returns a fixed embedding and logs prompts."""
+
+    def __init__(self, vector: list[float]):
+        self.vector = vector
+        self.prompts: list[str] = []
+
+    def embeddings(self, model, prompt):
+        self.prompts.append(prompt)
+        return {"embedding": list(self.vector)}
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    """
+    Build a 2k-point embedded index and install it as the module's client.
+
+    Thread sizes are skewed (a few threads hold hundreds of messages) and
+    ts_float is drawn from a small set of values so most timestamps collide.
+    message_index runs 0.. per source_file; every 100th point has none, like
+    messages indexed before the field existed. `ts` is unique per point.
+    Points by the "Rare" user share TIE_VECTOR, text and date, so they tie
+    exactly in search scoring.
+    Returns the payloads, vectors and a {(channel_lower, thread_ts): payloads}
+    map for brute-force checks.
+    """
+    rng = random.Random(1234)
+    threads = [
+        (channel, f"{1700000000 + n}.{n:06d}")
+        for n, channel in enumerate(rng.choice(CHANNELS) for _ in range(40))
+    ]
+    weights = [1 / (rank + 1) for rank in range(len(threads))]
+
+    points = []
+    payloads: list[dict] = []
+    vectors: list[list[float]] = []
+    next_index: dict[str, int] = {}
+    by_thread: dict[tuple[str, str], list[dict]] = {}
+    for point_id in range(NUM_POINTS):
+        channel, thread_ts = rng.choices(threads, weights=weights)[0]
+        source_file = f"{channel}.json"
+        payload = {
+            "channel": channel,
+            "channel_lower": channel.lower(),
+            "thread_ts": thread_ts,
+            "ts": f"{point_id}",
+            # ~25 distinct values across 2k points -> heavy ties within threads
+            "ts_float": 1.7e9 + rng.randrange(25),
+            "date": rng.choice(DATES),
+            "user_name": "user",
+            "user_name_lower": "user",
+            "text": " ".join([f"message {point_id}"] + rng.sample(WORDS, 3)),
+            "is_reply": True,
+            "source_file": source_file,
+            "permalink": "",
+        }
+        if point_id % 100 != 0:
+            payload["message_index"] = next_index.get(source_file, 0)
+            next_index[source_file] = payload["message_index"] + 1
+        vector = [rng.uniform(-1, 1) for _ in range(4)]
+        if point_id % 250 == 7:
+            vector = TIE_VECTOR
+            payload.update(
+                date="2024-05-05",
+                user_name="Rare",
+                user_name_lower="rare",
+                text="tied venue message",
+            )
+        points.append(PointStruct(id=point_id, vector=vector, payload=payload))
+        payloads.append(payload)
+        vectors.append(vector)
+        by_thread.setdefault((channel.lower(), thread_ts), []).append(payload)
+
+    client = QdrantClient(path=str(tmp_path_factory.mktemp("qdrant")))
+    client.create_collection(
+        query_engine.COLLECTION_NAME,
+        vectors_config=VectorParams(size=4, distance=Distance.COSINE),
+    )
+    client.upsert(query_engine.COLLECTION_NAME, points)
+
+    previous = query_engine._client
+    query_engine._client = client
+    yield SimpleNamespace(payloads=payloads, vectors=vectors, threads=by_thread)
+    query_engine._client = previous
+    client.close()
+
+
+def _assert_earliest(selected: list[dict], members: list[dict], limit: int) -> None:
+    """
+    `selected` must be the `limit` earliest members by ts_float, oldest first.
+
+    Ties at the cut-off may be broken either way, so compare ts_float
+    sequences and require every member strictly before the cut-off.
+    """
+    expected_ts = sorted(member["ts_float"] for member in members)[:limit]
+    assert [item["ts_float"] for item in selected] == expected_ts
+
+    member_ids = {member["ts"] for member in members}
+    selected_ids = [item["ts"] for item in selected]
+    assert len(set(selected_ids)) == len(selected_ids)
+    assert set(selected_ids) <= member_ids
+    if expected_ts:
+        cutoff = expected_ts[-1]
+        required = {m["ts"] for m in members if m["ts_float"] < cutoff}
+        assert required <= set(selected_ids)
+
+
+@pytest.fixture
+def ollama_stub(index, monkeypatch):
+    """Stub Ollama, a fresh embedding cache and an embed pool for search_messages."""
+    stub = StubOllama([1.0, 0.0, 0.0, 0.0])
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(query_engine, "_ollama_client", stub)
+    monkeypatch.setattr(query_engine, "_embedding_cache", OrderedDict())
+    monkeypatch.setattr(query_engine, "_embed_pool", pool)
+    yield stub
+    pool.shutdown()
+
+
+# ---------------------------------------------------------------------------
+# _get_thread_previews
+# ---------------------------------------------------------------------------
+
+
+def test_thread_previews_match_brute_force(index):
+    rng = random.Random(99)
+    keys = list(index.threads)
+    for _ in range(NUM_THREAD_SETS):
+        limit = rng.choice([1, 3, 12, 50])
+        requested = rng.sample(keys, rng.randint(1, 10))
+        # Duplicates, upper-cased channels and an unknown thread all appear
+        # in real search results
+        requested += rng.sample(requested, rng.randint(0, len(requested)))
+        requested = [(channel.upper(), thread_ts) for channel, thread_ts in requested]
+        requested.append(("general", "0.000000"))
+        rng.shuffle(requested)
+
+        previews = query_engine._get_thread_previews(requested, limit=limit)
+
+        assert len(previews) == len(requested)
+        for (channel, thread_ts), preview in zip(requested, previews):
+            members = index.threads.get((channel.lower(), thread_ts), [])
+            _assert_earliest(preview, members, limit)
+            assert all(
+                set(item) <= set(query_engine.THREAD_PAYLOAD_FIELDS) for item in preview
+            )
+
+
+@pytest.mark.parametrize("limit", [1, 12, 200])
+def test_thread_previews_agree_with_get_thread_messages(index, limit):
+    keys = list(index.threads)
+    previews = query_engine._get_thread_previews(keys, limit=limit)
+
+    for (channel, thread_ts), preview in zip(keys, previews):
+        messages = query_engine.get_thread_messages(channel, thread_ts, limit=limit)
+        _assert_earliest(messages, index.threads[(channel, thread_ts)], limit)
+        assert [item["ts_float"] for item in preview] == [
+            item["ts_float"] for item in messages
+        ]
+
+
+def test_thread_previews_empty_input(index):
+    assert query_engine._get_thread_previews([], limit=12) == []
+
+
+# ---------------------------------------------------------------------------
+# _get_source_windows
+# ---------------------------------------------------------------------------
+
+
+def _per_hit_window(
+    source_file: str, message_index: int, before: int = 1, after: int = 2
+) -> list[dict]:
+    """The single-anchor scroll `_get_source_windows` replaced, as reference."""
+    points, _ = query_engine.get_client().scroll(
+        collection_name=query_engine.COLLECTION_NAME,
+        scroll_filter=Filter(
+            must=[
+                FieldCondition(key="source_file", match=MatchValue(value=source_file)),
+                FieldCondition(
+                    key="message_index",
+                    range=Range(gte=message_index - before, lte=message_index + after),
+                ),
+            ]
+        ),
+        limit=before + after + 1,
+        with_payload=True,
+        with_vectors=False,
+    )
+    ordered = sorted(points, key=lambda point: point.payload.get("message_index", 0))
+    return [
+        {
+            field: point.payload.get(field)
+            for field in ("channel", "date", "ts", "user_name", "text")
+        }
+        for point in ordered
+    ]
+
+
+def test_source_windows_match_per_hit_lookup(index):
+    rng = random.Random(7)
+    anchors = [
+        (payload["source_file"], payload["message_index"])
+        for payload in rng.sample(index.payloads, 60)
+        if "message_index" in payload
+    ]
+    # First/last message of a file: windows clipped at the edges
+    anchors += [("general.json", 0), ("General.json", 0)]
+    anchors += [(payload["source_file"], 0) for payload in index.payloads[:3]]
+
+    windows = query_engine._get_source_windows(anchors, before=1, after=2)
+
+    assert windows == [_per_hit_window(*anchor) for anchor in anchors]
+
+
+def test_source_windows_overlapping_anchors_in_one_file(index):
+    source_file = index.payloads[1]["source_file"]
+    # Adjacent, identical and nested anchors share points between windows
+    anchors = [(source_file, i) for i in (10, 11, 11, 12, 14)]
+
+    windows = query_engine._get_source_windows(anchors, before=1, after=2)
+
+    assert windows == [_per_hit_window(*anchor) for anchor in anchors]
+    assert [len(window) for window in windows] == [4, 4, 4, 4, 4]
+    assert windows[1] == windows[2]
+    assert windows[0][1:] == windows[1][:3]
+
+
+def test_source_windows_missing_message_index_gets_empty_window(index):
+    source_file = index.payloads[1]["source_file"]
+    anchors = [(source_file, None), (source_file, 5), ("missing.json", None)]
+
+    windows = query_engine._get_source_windows(anchors)
+
+    assert windows == [[], _per_hit_window(source_file, 5), []]
+    assert query_engine._get_source_windows([(source_file, None)]) == [[]]
+    assert query_engine._get_source_windows([]) == []
+
+
+def test_search_messages_attaches_source_windows(index, ollama_stub):
+    # Query with the vector of a point that has no message_index so that hit
+    # ranks first
+    ollama_stub.vector = index.vectors[0]
+    assert "message_index" not in index.payloads[0]
+
+    results = query_engine.search_messages(
+        "window check", limit=20, include_thread_context=False
+    )
+
+    assert results[0]["ts"] == index.payloads[0]["ts"]
+    for item in results:
+        if item["message_index"] is None:
+            assert item["context"] == []
+        else:
+            assert item["context"] == _per_hit_window(
+                item["source_file"], item["message_index"]
+            )
+        assert item["thread_preview"] == []
+
+
+# ---------------------------------------------------------------------------
+# search_messages scoring and top-K selection
+# ---------------------------------------------------------------------------
+
+
+def _reference_score(hit, query: str) -> float:
+    """Hybrid score as originally written: set overlap + strptime recency."""
+    query_terms = set(re.findall(r"[a-z0-9#@._-]+", query.lower()))
+    text_terms = set(re.findall(r"[a-z0-9#@._-]+", hit.payload["text"].lower()))
+    lexical = (
+        len(query_terms & text_terms) / len(query_terms)
+        if query_terms and text_terms
+        else 0.0
+    )
+    try:
+        msg_date = datetime.strptime(hit.payload["date"], "%Y-%m-%d").date()
+        age_days = max(0, min((date.today() - msg_date).days, 3650))
+        recency = 1.0 - age_days / 3650.0
+    except ValueError:
+        recency = 0.0
+    return hit.score + 0.20 * lexical + 0.05 * recency
+
+
+@pytest.mark.parametrize(
+    "query, vector, limit, filters",
+    [
+        ("venue booking #general", None, 15, {}),
+        ("@bob lunch v1.2", None, 1, {"channel": "RANDOM"}),
+        ("deploy", None, 100, {}),
+        # Exact ties at the top: selection must keep Qdrant's order
+        ("zzz", TIE_VECTOR, 5, {}),
+        # Fewer candidates than `limit` (the no-argpartition branch)
+        ("tied venue", TIE_VECTOR, 15, {"user": "RARE"}),
+    ],
+)
+def test_search_messages_ranking_matches_full_sort(
+    index, ollama_stub, query, vector, limit, filters
+):
+    ollama_stub.vector = vector or index.vectors[42]
+    query_filter = None
+    if filters.get("channel"):
+        query_filter = Filter(
+            must=[
+                FieldCondition(
+                    key="channel_lower",
+                    match=MatchValue(value=filters["channel"].lower()),
+                )
+            ]
+        )
+    if filters.get("user"):
+        query_filter = Filter(
+            must=[
+                FieldCondition(
+                    key="user_name_lower",
+                    match=MatchValue(value=filters["user"].lower()),
+                )
+            ]
+        )
+    hits = (
+        query_engine.get_client()
+        .query_points(
+            collection_name=query_engine.COLLECTION_NAME,
+            query=ollama_stub.vector,
+            query_filter=query_filter,
+            limit=max(40, limit * 8),
+        )
+        .points
+    )
+    expected = sorted(hits, key=lambda hit: _reference_score(hit, query), reverse=True)
+    expected = expected[:limit]
+
+    results = query_engine.search_messages(
+        query, limit=limit, include_thread_context=False, **filters
+    )
+
+    assert [item["ts"] for item in results] == [hit.payload["ts"] for hit in expected]
+    assert [item["score"] for item in results] == pytest.approx(
+        [_reference_score(hit, query) for hit in expected]
+    )
+    if filters.get("user"):
+        assert len(hits) < limit
+
+
+def test_search_messages_no_hits_returns_empty(index, ollama_stub):
+    # All points carry 2023 timestamps
+    assert query_engine.search_messages("venue", start_date="2030-01-01") == []
+
+
+def test_keyword_overlap_on_term_sets():
+    query_terms = query_engine._keyword_terms("Venue booking #General")
+    assert query_terms == frozenset({"venue", "booking", "#general"})
+
+    text_terms = query_engine._keyword_terms("VENUE is booked in #general, venue")
+    assert query_engine._keyword_overlap(query_terms, text_terms) == pytest.approx(
+        2 / 3
+    )
+    assert query_engine._keyword_overlap(query_terms, frozenset()) == 0.0
+    assert query_engine._keyword_overlap(frozenset(), text_terms) == 0.0
+
+
+def test_recency_boost():
+    today = date(2025, 6, 1).toordinal()
+    assert query_engine._recency_boost("2025-06-01", today) == 1.0
+    assert query_engine._recency_boost(
+        str(date(2025, 6, 1) - timedelta(days=1825)), today
+    ) == pytest.approx(0.5)
+    # Clamped at both ends of the ten-year window
+    assert query_engine._recency_boost("2030-01-01", today) == 1.0
+    assert query_engine._recency_boost("2001-01-01", today) == 0.0
+    # Unparseable dates score 0
+    for invalid in ("", "bogus", "2025-13-01", None):
+        assert query_engine._recency_boost(invalid, today) == 0.0
+
+
+def test_ensure_collection_skips_payload_indexes_on_local_client(index, recwarn):
+    assert query_engine.ensure_collection() is query_engine.get_client()
+    assert not [w for w in recwarn if "Payload indexes" in str(w.message)]
+
+
+# ---------------------------------------------------------------------------
+# get_stats TTL cache
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def stats_env(index, monkeypatch):
+    """In-memory state.db, a controllable clock and an empty stats cache."""
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.execute("CREATE TABLE indexed_files (channel, message_count, indexed_at)")
+    conn.execute("INSERT INTO indexed_files VALUES ('general', 30, '2025-01-01')")
+    clock = SimpleNamespace(now=1_000.0)
+    monkeypatch.setattr(query_engine, "_sqlite_conn", conn)
+    monkeypatch.setattr(query_engine, "_stats_cache", (0.0, None))
+    monkeypatch.setattr(config, "STATS_CACHE_TTL_SECONDS", 30.0)
+    monkeypatch.setattr(query_engine.time, "monotonic", lambda: clock.now)
+    yield SimpleNamespace(conn=conn, clock=clock)
+    conn.close()
+
+
+def test_stats_cache_hit_expiry_and_copy(stats_env):
+    stats = query_engine.get_stats()
+    assert stats["indexed_files"] == 1
+    assert stats["qdrant_points"] == NUM_POINTS
+
+    # Callers get copies; mutating one must not leak into the cache
+    stats["indexed_files"] = -1
+    stats_env.conn.execute(
+        "INSERT INTO indexed_files VALUES ('random', 5, '2025-02-01')"
+    )
+    stats_env.clock.now += 29.0
+    assert query_engine.get_stats()["indexed_files"] == 1
+
+    stats_env.clock.now += 1.0
+    assert query_engine.get_stats()["indexed_files"] == 2
+
+
+def test_stats_cache_skips_failed_qdrant_count(stats_env, monkeypatch):
+    client = query_engine._client
+    monkeypatch.setattr(query_engine, "_client", None)
+    assert query_engine.get_stats()["qdrant_points"] == 0
+
+    # Qdrant back: the next call recounts instead of serving the cached 0
+    monkeypatch.setattr(query_engine, "_client", client)
+    assert query_engine.get_stats()["qdrant_points"] == NUM_POINTS
+
+
+# ---------------------------------------------------------------------------
+# get_query_embedding LRU
+# ---------------------------------------------------------------------------
+
+
+def test_query_embedding_cache_hit_skips_ollama(ollama_stub):
+    first = query_engine.get_query_embedding("venue booking")
+    second = query_engine.get_query_embedding("venue booking")
+
+    assert second is first
+    assert ollama_stub.prompts == ["venue booking"]
+
+
+def test_query_embedding_cache_collapses_whitespace(ollama_stub):
+    first = query_engine.get_query_embedding("  venue\tbooking \n")
+    second = query_engine.get_query_embedding("venue booking")
+
+    assert second is first
+    # The normalized text is what gets embedded; case is significant
+    assert ollama_stub.prompts == ["venue booking"]
+    query_engine.get_query_embedding("Venue booking")
+    assert ollama_stub.prompts == ["venue booking", "Venue booking"]
+
+
+def test_query_embedding_cache_evicts_least_recently_used(ollama_stub, monkeypatch):
+    monkeypatch.setattr(config, "EMBED_CACHE_SIZE", 2)
+    for query in ("a", "b", "a", "c"):
+        query_engine.get_query_embedding(query)
+
+    # "a" was refreshed by its second lookup, so "b" is the one evicted
+    assert list(query_engine._embedding_cache) == ["a", "c"]
+    assert ollama_stub.prompts == ["a", "b", "c"]
+    query_engine.get_query_embedding("b")
+    assert ollama_stub.prompts == ["a", "b", "c", "b"]
+    assert list(query_engine._embedding_cache) == ["c", "b"]
+
+
+def test_query_embedding_is_read_only(ollama_stub):
+    vector = query_engine.get_query_embedding("venue")
+
+    assert vector.dtype == np.float32
+    assert not vector.flags.writeable
+    with pytest.raises(ValueError):
+        vector[0] = 0.0